@@ -1,7 +1,13 @@
 """Gemini AI Agent with function calling for tool execution."""
 
+import asyncio
+import contextlib
+import hashlib
 import json
 import logging
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 
 from google import genai
 from google.genai import types
@@ -12,6 +18,42 @@ from controller.tools.base import ToolRegistry
 
 logger = logging.getLogger(__name__)
 
+MAX_ARG_PREVIEW = 200  # Longest bulk payload shown verbatim in confirmation prompts
+# Arguments carrying file contents; anything else, such as a shell command or
+# commit message, is always shown in full so the user sees exactly what runs
+BULK_ARG_KEYS = frozenset({"content"})
+MAX_CONFIRMATION_CHARS = 1800  # Keeps the prompt within one Discord message
+# Yielded by Agent.process_message before each round of tool calls, so callers
+# can send buffered text before tools run; harmless if simply concatenated
+TOOL_ROUND = ""
+
+
+def _summarize_args(kwargs: dict) -> str:
+    """Serialize tool arguments for display, shortening long bulk payloads."""
+    summary = {
+        key: (
+            f"{value[:MAX_ARG_PREVIEW]}... ({len(value)} chars)"
+            if key in BULK_ARG_KEYS and isinstance(value, str) and len(value) > MAX_ARG_PREVIEW
+            else value
+        )
+        for key, value in kwargs.items()
+    }
+    return json.dumps(summary, ensure_ascii=False)
+
+
+@dataclass(slots=True)
+class _ToolCache:
+    """Memoized tool results for one channel's turn."""
+
+    results: dict[tuple[str, str], str] = field(default_factory=dict)
+    # Bumped on every clear, so a read that started before a write can tell
+    # its result may be stale and skip storing it
+    epoch: int = 0
+
+    def clear(self) -> None:
+        self.results.clear()
+        self.epoch += 1
+
 
 class Agent:
     """AI Agent that uses Gemini for reasoning and local tools for execution.
@@ -21,6 +63,7 @@ class Agent:
     """
 
     MAX_TOOL_ROUNDS = 10  # Prevent infinite tool-calling loops
+    MAX_HISTORY = 40  # Keep history manageable (last 20 turns)
 
     def __init__(
         self,
@@ -32,35 +75,58 @@ class Agent:
         self.model = config.gemini_model
         self.tool_registry = tool_registry
         self.permissions = permission_manager
-        self._conversations: dict[str, list[types.Content]] = {}
+        self._conversations: dict[str, deque[types.Content]] = {}
+        # Memoized tool results, per channel and only for the turn in progress
+        self._tool_caches: dict[str, _ToolCache] = {}
+        self._tools_config = self._build_tools_config()
+        self._tools_version = tool_registry.version
 
-    def _get_tools_config(self) -> list[types.Tool]:
+    def _build_tools_config(self) -> list[types.Tool]:
         """Build Gemini tools configuration from registered tools."""
-        declarations = []
-        for tool in self.tool_registry.get_all():
-            declarations.append(types.FunctionDeclaration(
-                name=tool.name,
-                description=tool.description,
-                parameters=tool.parameters,
-            ))
+        # The SDK accepts plain declaration dicts and validates them in one pass
+        declarations = self.tool_registry.get_function_declarations()
         return [types.Tool(function_declarations=declarations)]
 
-    def _get_history(self, channel_id: str) -> list[types.Content]:
-        """Get or create conversation history for a channel."""
-        if channel_id not in self._conversations:
-            self._conversations[channel_id] = []
-        return self._conversations[channel_id]
+    def _get_tools_config(self) -> list[types.Tool]:
+        """Return the cached tools configuration, rebuilding if the registry changed."""
+        if self._tools_version != self.tool_registry.version:
+            self._tools_config = self._build_tools_config()
+            self._tools_version = self.tool_registry.version
+        return self._tools_config
+
+    def _get_history(self, channel_id: str) -> deque[types.Content]:
+        """Get or create conversation history for a channel.
+
+        The deque evicts the oldest entries automatically once MAX_HISTORY is reached.
+        """
+        history = self._conversations.get(channel_id)
+        if history is None:
+            history = self._conversations[channel_id] = deque(maxlen=self.MAX_HISTORY)
+        return history
 
     def clear_history(self, channel_id: str) -> None:
         """Clear conversation history for a channel."""
         self._conversations.pop(channel_id, None)
+        self.clear_tool_cache(channel_id)
+
+    def clear_tool_cache(self, channel_id: str) -> None:
+        """Drop memoized tool results for a channel."""
+        cache = self._tool_caches.get(channel_id)
+        if cache is not None:
+            cache.clear()
+
+    @staticmethod
+    def _cache_key(tool_name: str, kwargs: dict) -> tuple[str, str]:
+        """Build a stable cache key from a tool name and its arguments."""
+        args_json = json.dumps(kwargs, sort_keys=True, default=str)
+        return tool_name, hashlib.sha256(args_json.encode()).hexdigest()
 
     async def process_message(
         self,
         channel_id: str,
         user_message: str,
         confirmation_callback=None,
-    ) -> str:
+    ) -> AsyncIterator[str]:
         """Process a user message through the AI agent.
 
         Args:
@@ -69,8 +135,9 @@ class Agent:
             confirmation_callback: Async callback for dangerous operations.
                 Signature: async (tool_name, description) -> bool
 
-        Returns:
-            The agent's text response.
+        Yields:
+            Pieces of the agent's text response as they are generated, plus
+            TOOL_ROUND before each round of tool calls.
         """
         history = self._get_history(channel_id)
 
@@ -81,71 +148,104 @@ class Agent:
         )
         history.append(user_content)
 
-        # Keep history manageable (last 20 turns)
-        if len(history) > 40:
-            history[:] = history[-40:]
-
+        # Files may have changed since the last message, so each turn starts
+        # with an empty tool cache and drops it when done
+        cache = self._tool_caches[channel_id] = _ToolCache()
+        emitted_text = False
         try:
-            return await self._run_agent_loop(channel_id, history, confirmation_callback)
+            async for text in self._run_agent_loop(channel_id, history, confirmation_callback):
+                emitted_text = emitted_text or bool(text)
+                yield text
         except Exception as e:
             logger.error(f"Agent error: {e}", exc_info=True)
-            return f"An error occurred while processing your request: {e}"
+            if emitted_text:
+                # Keep the error apart from any partially streamed answer
+                yield "\n\n"
+            yield f"An error occurred while processing your request: {e}"
+        finally:
+            if self._tool_caches.get(channel_id) is cache:
+                del self._tool_caches[channel_id]
 
     async def _run_agent_loop(
         self,
         channel_id: str,
-        history: list[types.Content],
+        history: deque[types.Content],
         confirmation_callback,
-    ) -> str:
-        """Run the agent loop: send to Gemini, execute tools, repeat."""
+    ) -> AsyncIterator[str]:
+        """Run the agent loop: stream from Gemini, execute tools, repeat."""
+        tools_config = self._get_tools_config()
+        # Tool calls in this response prompt for confirmation one at a time;
+        # other channels' prompts are unaffected
+        confirmation_lock = asyncio.Lock()
+        emitted_text = False
         for round_num in range(self.MAX_TOOL_ROUNDS):
-            response = self.client.models.generate_content(
+            stream = await self.client.aio.models.generate_content_stream(
                 model=self.model,
-                contents=history,
+                contents=list(history),
                 config=types.GenerateContentConfig(
                     system_instruction=SYSTEM_PROMPT,
-                    tools=self._get_tools_config(),
+                    tools=tools_config,
                     temperature=0.3,
                 ),
             )
 
-            candidate = response.candidates[0]
-            content = candidate.content
+            # Forward text as it arrives and collect all parts for history
+            parts: list[types.Part] = []
+            round_has_text = False
+            async for chunk in stream:
+                if not chunk.candidates or chunk.candidates[0].content is None:
+                    continue
+                for part in chunk.candidates[0].content.parts or []:
+                    parts.append(part)
+                    if part.text and not part.thought:
+                        if emitted_text and not round_has_text:
+                            # Separate text from earlier rounds
+                            yield "\n\n"
+                        round_has_text = emitted_text = True
+                        yield part.text
 
             # Add model response to history
-            history.append(content)
+            if parts:
+                history.append(types.Content(role="model", parts=parts))
 
             # Check if model wants to call functions
-            function_calls = [
-                part for part in content.parts
-                if part.function_call is not None
-            ]
+            function_calls = [part for part in parts if part.function_call is not None]
 
             if not function_calls:
                 # Model returned text, we're done
-                text_parts = [
-                    part.text for part in content.parts
-                    if part.text is not None
-                ]
-                return "\n".join(text_parts) if text_parts else "Done."
-
-            # Execute function calls
-            function_responses = []
-            for part in function_calls:
-                fc = part.function_call
-                tool_name = fc.name
-                tool_args = dict(fc.args) if fc.args else {}
-
-                result = await self._execute_tool(
-                    tool_name, tool_args, confirmation_callback
-                )
-
-                function_responses.append(
-                    types.Part.from_function_response(
-                        name=tool_name,
-                        response={"result": result},
+                if not emitted_text:
+                    yield "Done."
+                return
+
+            yield TOOL_ROUND
+            calls = [
+                (part.function_call.name, dict(part.function_call.args or {}))
+                for part in function_calls
+            ]
+            if all(self._is_read_only(name) for name, _ in calls):
+                # Read-only calls can't affect each other, so run them concurrently
+                results = await asyncio.gather(*[
+                    self._execute_tool(
+                        channel_id, name, args, confirmation_callback, confirmation_lock
                     )
+                    for name, args in calls
+                ])
+            else:
+                # A later call may depend on an earlier write (e.g. write_file then
+                # git_commit), so run the batch in the order the model emitted it
+                results = [
+                    await self._execute_tool(
+                        channel_id, name, args, confirmation_callback, confirmation_lock
+                    )
+                    for name, args in calls
+                ]
+            function_responses = [
+                types.Part.from_function_response(
+                    name=part.function_call.name,
+                    response={"result": result},
                 )
+                for part, result in zip(function_calls, results)
+            ]
 
             # Add function responses to history
             response_content = types.Content(
@@ -154,17 +254,28 @@ class Agent:
             )
             history.append(response_content)
 
-        return "Reached maximum number of tool calls. Please try a simpler request."
+        yield "Reached maximum number of tool calls. Please try a simpler request."
+
+    def _is_read_only(self, tool_name: str) -> bool:
+        """Check if a tool is registered and free of side effects."""
+        tool = self.tool_registry.get(tool_name)
+        return tool is not None and tool.can_memoize
 
     async def _execute_tool(
         self,
+        channel_id: str,
         tool_name: str,
         kwargs: dict,
         confirmation_callback,
+        confirmation_lock: asyncio.Lock | None = None,
     ) -> str:
-        """Execute a single tool with permission checks."""
-        tool = self.tool_registry.get(tool_name)
-        if not tool:
+        """Execute a single tool with permission checks.
+
+        Confirmation prompts are serialized on confirmation_lock when given.
+        """
+        try:
+            tool = self.tool_registry[tool_name]
+        except KeyError:
             return f"Error: Unknown tool '{tool_name}'"
 
         # Check path permissions
@@ -174,17 +285,41 @@ class Agent:
 
         # Check if confirmation is needed
         if self.permissions.needs_confirmation(tool_name) and confirmation_callback:
-            args_summary = json.dumps(kwargs, indent=2, ensure_ascii=False)
+            args_summary = _summarize_args(kwargs)
             description = f"**{tool_name}**\n```json\n{args_summary}\n```"
-            confirmed = await confirmation_callback(tool_name, description)
+            if len(description) > MAX_CONFIRMATION_CHARS:
+                # Never ask the user to approve something they can't see in full
+                return (
+                    f"Error: arguments to '{tool_name}' are too long to show for "
+                    f"confirmation ({len(description)} chars). Split it into smaller steps."
+                )
+            async with confirmation_lock or contextlib.nullcontext():
+                confirmed = await confirmation_callback(tool_name, description)
             if not confirmed:
                 return f"Operation '{tool_name}' was denied by user."
 
+        # Serve idempotent tools from this channel's cache when possible
+        cache = self._tool_caches.get(channel_id)
+        if cache is None:
+            cache = self._tool_caches[channel_id] = _ToolCache()
+        cache_key = self._cache_key(tool_name, kwargs) if tool.can_memoize else None
+        if cache_key in cache.results:
+            logger.info(f"Using cached result for tool: {tool_name}")
+            return cache.results[cache_key]
+        epoch = cache.epoch
+
         # Execute the tool
         logger.info(f"Executing tool: {tool_name} with args: {kwargs}")
         try:
             result = await tool.execute(**kwargs)
-            return result
         except Exception as e:
             logger.error(f"Tool execution error: {e}", exc_info=True)
             return f"Error executing {tool_name}: {e}"
+
+        if cache_key is None:
+            # Side-effecting tools may have changed files or the repo state
+            cache.clear()
+        elif cache.epoch == epoch and not result.startswith("Error"):
+            # Calls run concurrently, so only store if no write landed meanwhile
+            cache.results[cache_key] = result
+        return result
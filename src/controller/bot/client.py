@@ -2,11 +2,12 @@
 
 import asyncio
 import logging
+import re
 
 import discord
 from discord.ext import commands
 
-from controller.agent.core import Agent
+from controller.agent.core import TOOL_ROUND, Agent
 from controller.bot.formatter import format_error, split_message
 from controller.config import Config
 from controller.security.permissions import PermissionManager
@@ -69,6 +70,8 @@ class ConfirmationView(discord.ui.View):
 class AntigravityBot(commands.Bot):
     """Discord Bot that integrates Gemini AI with local development tools."""
 
+    STREAM_FLUSH_CHARS = 1900  # Send streamed text once a full Discord message is buffered
+
     def __init__(self, config: Config):
         intents = discord.Intents.default()
         intents.message_content = True
@@ -76,6 +79,7 @@ class AntigravityBot(commands.Bot):
         self.config = config
         self.agent: Agent | None = None
         self.permissions: PermissionManager | None = None
+        self._mention_re: re.Pattern[str] | None = None
 
     async def setup_hook(self):
         """Initialize agent, tools, and permissions on bot startup."""
@@ -106,6 +110,7 @@ class AntigravityBot(commands.Bot):
     async def on_ready(self):
         """Called when the bot is connected and ready."""
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
+        self._mention_re = re.compile(rf"<@!?{self.user.id}>")
         logger.info(f"Allowed directories: {self.config.allowed_directories}")
         logger.info(f"Gemini model: {self.config.gemini_model}")
 
@@ -157,9 +162,9 @@ class AntigravityBot(commands.Bot):
 
         # Clean the message (remove bot mention)
         content = message.content
-        if self.user:
-            content = content.replace(f"<@{self.user.id}>", "").strip()
-            content = content.replace(f"<@!{self.user.id}>", "").strip()
+        if is_mentioned and self._mention_re:
+            content = self._mention_re.sub("", content)
+        content = content.strip()
 
         if not content:
             await message.reply("Please provide a message.")
@@ -174,14 +179,29 @@ class AntigravityBot(commands.Bot):
                 await message.channel.send(confirm_msg, view=view)
                 return await view.wait_for_result()
 
-            # Process through AI agent
-            response = await self.agent.process_message(
+            # Stream the AI agent's response, sending each full chunk as soon as it is ready
+            buffer = ""
+            async for text in self.agent.process_message(
                 channel_id=str(message.channel.id),
                 user_message=content,
                 confirmation_callback=confirm_callback,
-            )
-
-        # Send response (split if needed)
-        chunks = split_message(response)
-        for chunk in chunks:
-            await message.channel.send(chunk)
+            ):
+                if text == TOOL_ROUND:
+                    # Tools can be slow or ask for confirmation, so show the text so far
+                    await self._send_text(message.channel, buffer)
+                    buffer = ""
+                    continue
+                buffer += text
+                if len(buffer) > self.STREAM_FLUSH_CHARS:
+                    *ready, buffer = split_message(buffer, self.STREAM_FLUSH_CHARS)
+                    for chunk in ready:
+                        await message.channel.send(chunk)
+
+        # Send whatever is left (split if needed)
+        await self._send_text(message.channel, buffer)
+
+    async def _send_text(self, channel: discord.abc.Messageable, text: str) -> None:
+        """Send text as one or more Discord messages, skipping blank chunks."""
+        for chunk in split_message(text, self.STREAM_FLUSH_CHARS):
+            if chunk.strip():
+                await channel.send(chunk)
@@ -3,6 +3,8 @@
 Handles Discord's 2000-character message limit and code block formatting.
 """
 
+_TRUNCATED_SUFFIX = "\n... (truncated)"
+
 
 def split_message(text: str, max_length: int = 1900) -> list[str]:
     """Split a long message into chunks that fit Discord's limit.
@@ -14,56 +16,78 @@ def split_message(text: str, max_length: int = 1900) -> list[str]:
         return [text]
 
     chunks = []
-    remaining = text
-
-    while remaining:
-        if len(remaining) <= max_length:
-            chunks.append(remaining)
+    start = 0
+    prefix = ""
+    in_code_block = False
+
+    while start < len(text):
+        # A reopened code fence carried over from the last chunk counts
+        # towards this chunk's length, so measure the window from before it
+        origin = start - len(prefix)
+        end = origin + max_length
+        if len(text) <= end:
+            chunks.append(prefix + text[start:])
             break
 
         # Try to find a good split point
-        split_at = _find_split_point(remaining, max_length)
-        chunk = remaining[:split_at].rstrip()
-        remaining = remaining[split_at:].lstrip("\n")
-
-        # Handle code blocks that might be split
-        if chunk.count("```") % 2 != 0:
-            # Odd number of ``` means we're inside a code block
+        split_at = _find_split_point(text, origin, end)
+        chunk = prefix + text[start:split_at].rstrip()
+
+        # Handle code blocks that might be split: an odd number of ``` in
+        # the emitted text flips whether we're inside a code block
+        if text.count("```", start, split_at) % 2 != 0:
+            in_code_block = not in_code_block
+        if in_code_block:
             chunk += "\n```"
-            remaining = "```\n" + remaining
+            prefix = "```\n"
+        else:
+            prefix = ""
+
+        start = split_at
+        while start < len(text) and text[start] == "\n":
+            start += 1
 
         chunks.append(chunk)
 
     return chunks if chunks else [""]
 
 
-def _find_split_point(text: str, max_length: int) -> int:
-    """Find the best position to split text at."""
+def _find_split_point(text: str, start: int, end: int) -> int:
+    """Find the best position to split text[start:end] at.
+
+    Searches run over the original string between the given offsets, so no
+    per-chunk copy of the remaining text is made. Each search only scans the
+    part of the window where a match would be accepted, so a missing boundary
+    never costs a full-window scan.
+    """
+    half = start + (end - start) // 2
+    third = start + (end - start) // 3
+
     # Try splitting at a code block boundary
-    last_block = text.rfind("```\n", 0, max_length)
-    if last_block > max_length // 2:
+    last_block = text.rfind("```\n", half + 1, end)
+    if last_block != -1:
         # Find the end of this code block line
         newline_after = text.find("\n", last_block + 3)
-        if newline_after != -1 and newline_after <= max_length:
+        if newline_after != -1 and newline_after <= end:
             return newline_after + 1
 
     # Try splitting at a blank line
-    last_blank = text.rfind("\n\n", 0, max_length)
-    if last_blank > max_length // 2:
+    last_blank = text.rfind("\n\n", half + 1, end)
+    if last_blank != -1:
         return last_blank + 1
 
     # Try splitting at a newline
-    last_newline = text.rfind("\n", 0, max_length)
-    if last_newline > max_length // 3:
+    last_newline = text.rfind("\n", third + 1, end)
+    if last_newline != -1:
         return last_newline + 1
 
     # Try splitting at a space
-    last_space = text.rfind(" ", 0, max_length)
-    if last_space > max_length // 3:
+    last_space = text.rfind(" ", third + 1, end)
+    if last_space != -1:
         return last_space + 1
 
     # Hard split
-    return max_length
+    return end
 
 
 def format_code_block(content: str, language: str = "") -> str:
@@ -81,8 +105,9 @@ def format_success(message: str) -> str:
     return f"**Done:** {message}"
 
 
-def truncate(text: str, max_length: int = 1800, suffix: str = "\n... (truncated)") -> str:
+def truncate(text: str, max_length: int = 1800, suffix: str = _TRUNCATED_SUFFIX) -> str:
     """Truncate text to max_length, adding suffix if truncated."""
     if len(text) <= max_length:
         return text
-    return text[: max_length - len(suffix)] + suffix
+    # Clamp so a suffix longer than max_length can't turn into a negative slice
+    return text[: max(0, max_length - len(suffix))] + suffix
@@ -2,13 +2,20 @@
 
 import os
 from dataclasses import dataclass, field
+from functools import cache
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-@dataclass
+@cache
+def _parse_csv(raw: str) -> tuple[str, ...]:
+    """Split a comma-separated env value into stripped, non-empty items."""
+    return tuple(item.strip() for item in raw.split(",") if item.strip())
+
+
+@dataclass(slots=True)
 class Config:
     """Application settings for Discord Bot, Gemini AI, and security."""
 
@@ -35,16 +42,8 @@ class Config:
             discord_guild_id=os.getenv("DISCORD_GUILD_ID", ""),
             gemini_api_key=os.getenv("GEMINI_API_KEY", ""),
             gemini_model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
-            allowed_directories=[
-                d.strip()
-                for d in os.getenv("ALLOWED_DIRECTORIES", "").split(",")
-                if d.strip()
-            ],
-            allowed_user_ids=[
-                u.strip()
-                for u in os.getenv("ALLOWED_USER_IDS", "").split(",")
-                if u.strip()
-            ],
+            allowed_directories=list(_parse_csv(os.getenv("ALLOWED_DIRECTORIES", ""))),
+            allowed_user_ids=list(_parse_csv(os.getenv("ALLOWED_USER_IDS", ""))),
             max_file_size_kb=int(os.getenv("MAX_FILE_SIZE_KB", "500")),
             command_timeout_seconds=int(os.getenv("COMMAND_TIMEOUT_SECONDS", "30")),
             require_confirmation=os.getenv("REQUIRE_CONFIRMATION", "true").lower() == "true",
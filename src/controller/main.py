@@ -1,5 +1,6 @@
 """Application entry point - starts the Discord Bot."""
 
+import asyncio
 import logging
 import sys
 
@@ -27,6 +28,15 @@ def main():
         logger.error("Please check your .env file. See .env.example for reference.")
         sys.exit(1)
 
+    # Use uvloop when it's installed; bot.run() picks up the loop policy
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+
     # Create and configure bot
     bot = AntigravityBot(config)
     setup_commands(bot)
@@ -11,10 +11,21 @@ class PermissionManager:
         "write_file", "run_command", "git_commit", "git_push",
     })
 
+    # Tool arguments that carry a filesystem path
+    PATH_KEYS = ("path", "repo_path", "directory", "cwd")
+
     def __init__(self, config):
         self.allowed_dirs = [Path(d).resolve() for d in config.allowed_directories]
+        # String forms for is_path_allowed; the trailing separator keeps
+        # "/repo" from matching "/repo-other"
+        self._allowed_exact = frozenset(str(d) for d in self.allowed_dirs)
+        self._allowed_prefixes = tuple(os.path.join(str(d), "") for d in self.allowed_dirs)
         self.allowed_users = set(config.allowed_user_ids)
         self.require_confirmation = config.require_confirmation
+        # Resolved once: confirmation settings don't change at runtime
+        self._confirm_tools: frozenset[str] = (
+            self.DANGEROUS_TOOLS if self.require_confirmation else frozenset()
+        )
 
     def is_path_allowed(self, path: str) -> bool:
         """Check if a path is within any allowed directory.
@@ -22,11 +33,8 @@ class PermissionManager:
         Resolves symlinks and prevents path traversal attacks.
         """
         try:
-            resolved = Path(path).resolve()
-            return any(
-                resolved == allowed or allowed in resolved.parents
-                for allowed in self.allowed_dirs
-            )
+            resolved = os.path.realpath(path)
+            return resolved in self._allowed_exact or resolved.startswith(self._allowed_prefixes)
         except (OSError, ValueError):
             return False
 
@@ -41,17 +49,14 @@ class PermissionManager:
 
     def needs_confirmation(self, tool_name: str) -> bool:
         """Check if a tool operation requires user confirmation."""
-        if not self.require_confirmation:
-            return False
-        return tool_name in self.DANGEROUS_TOOLS
+        return tool_name in self._confirm_tools
 
     def check_tool_paths(self, tool_name: str, kwargs: dict) -> str | None:
         """Validate all path arguments in a tool call.
 
         Returns an error message if any path is not allowed, or None if all OK.
         """
-        path_keys = ["path", "repo_path", "directory", "cwd"]
-        for key in path_keys:
+        for key in self.PATH_KEYS:
             if key in kwargs:
                 p = kwargs[key]
                 if not self.is_path_allowed(p):
@@ -27,6 +27,11 @@ class Tool(ABC):
         """Whether this tool requires user confirmation before execution."""
         return False
 
+    @property
+    def can_memoize(self) -> bool:
+        """Whether repeated calls with identical arguments may reuse a cached result."""
+        return False
+
     @abstractmethod
     async def execute(self, **kwargs) -> str:
         """Execute the tool with given parameters. Returns result string."""
@@ -37,10 +42,18 @@ class ToolRegistry:
 
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self.version = 0  # Bumped on every mutation so callers can invalidate caches
+        self._declarations: list[dict[str, Any]] | None = None
 
     def register(self, tool: Tool) -> None:
         """Register a tool instance."""
         self._tools[tool.name] = tool
+        self.version += 1
+        self._declarations = None
+
+    def __getitem__(self, name: str) -> Tool:
+        """Get a tool by name, raising KeyError if it is not registered."""
+        return self._tools[name]
 
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -51,15 +64,20 @@ class ToolRegistry:
         return list(self._tools.values())
 
     def get_function_declarations(self) -> list[dict[str, Any]]:
-        """Convert all tools to Gemini function declaration format."""
-        declarations = []
-        for tool in self._tools.values():
-            declarations.append({
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": tool.parameters,
-            })
-        return declarations
+        """Convert all tools to Gemini function declaration format.
+
+        The list is built once and reused until the next register() call.
+        """
+        if self._declarations is None:
+            self._declarations = [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": tool.parameters,
+                }
+                for tool in self._tools.values()
+            ]
+        return self._declarations
 
     def is_dangerous(self, tool_name: str) -> bool:
         """Check if a tool requires confirmation."""
@@ -1,11 +1,83 @@
 """File system tools for reading, writing, and searching files."""
 
+import asyncio
 import os
+import re
+from functools import partial
 from typing import Any
 
-import aiofiles
-
 from controller.tools.base import Tool
+from controller.tools.scanning import iter_matching_lines, may_contain, read_text, scan_concurrently
+
+# Deepest level list_directory descends to in recursive mode
+_LIST_MAX_DEPTH = 4
+_INDENTS = tuple("  " * i for i in range(_LIST_MAX_DEPTH + 1))
+_LIST_MAX_ENTRIES = 200
+
+
+def _write_text(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _collect_search_files(directory: str, ext_filter: str) -> list[str]:
+    filepaths = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for filename in sorted(files):
+            if filename.startswith("."):
+                continue
+            if ext_filter and not filename.endswith(ext_filter):
+                continue
+            filepaths.append(os.path.join(root, filename))
+    return filepaths
+
+
+# ASCII letters that re.IGNORECASE also matches to non-ASCII characters
+_NON_ASCII_FOLDS = {
+    "i": "\u0130\u0131",  # Dotted capital I, dotless small i
+    "k": "\u212a",  # Kelvin sign
+    "s": "\u017f",  # Long s
+}
+
+
+def _compile_prefilter(needle: str) -> re.Pattern[bytes] | None:
+    """Compile a bytes regex matching wherever a case-insensitive str search could.
+
+    Returns None for non-ASCII needles, whose case folding can't be mirrored
+    on bytes.
+    """
+    if not needle.isascii():
+        return None
+    parts = []
+    for ch in needle:
+        literal = re.escape(ch.encode())
+        extra = _NON_ASCII_FOLDS.get(ch.lower())
+        if extra:
+            alternatives = [literal, *(re.escape(c.encode()) for c in extra)]
+            literal = b"(?:" + b"|".join(alternatives) + b")"
+        parts.append(literal)
+    return re.compile(b"".join(parts), re.IGNORECASE)
+
+
+def _search_file(
+    directory: str,
+    pattern: re.Pattern[str],
+    bytes_pattern: re.Pattern[bytes] | None,
+    filepath: str,
+) -> list[str]:
+    if bytes_pattern is not None and not may_contain(filepath, bytes_pattern):
+        return []
+    try:
+        data = read_text(filepath)
+    except (UnicodeDecodeError, PermissionError):
+        return []
+    rel_path = os.path.relpath(filepath, directory)
+    return [
+        f"{rel_path}:{i}: {line.rstrip()}"
+        for i, line, _ in iter_matching_lines(data, pattern)
+    ]
 
 
 class ReadFileTool(Tool):
@@ -32,11 +104,14 @@ class ReadFileTool(Tool):
             "required": ["path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         path = kwargs["path"]
         try:
-            async with aiofiles.open(path, "r", encoding="utf-8") as f:
-                content = await f.read()
+            content = await asyncio.to_thread(read_text, path)
             line_count = content.count("\n") + 1
             return f"File: {path} ({line_count} lines)\n\n{content}"
         except FileNotFoundError:
@@ -86,9 +161,7 @@ class WriteFileTool(Tool):
         path = kwargs["path"]
         content = kwargs["content"]
         try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            async with aiofiles.open(path, "w", encoding="utf-8") as f:
-                await f.write(content)
+            await asyncio.to_thread(_write_text, path, content)
             return f"Successfully wrote {len(content)} characters to {path}"
         except Exception as e:
             return f"Error writing file: {e}"
@@ -122,6 +195,10 @@ class ListDirectoryTool(Tool):
             "required": ["path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         path = kwargs["path"]
         recursive = kwargs.get("recursive", False)
@@ -131,36 +208,68 @@ class ListDirectoryTool(Tool):
 
             entries = []
             if recursive:
-                for root, dirs, files in os.walk(path):
-                    # Skip hidden directories
-                    dirs[:] = [d for d in dirs if not d.startswith(".")]
-                    level = root.replace(path, "").count(os.sep)
-                    indent = "  " * level
-                    basename = os.path.basename(root)
-                    if level > 0:
-                        entries.append(f"{indent}{basename}/")
-                    for f in sorted(files):
-                        if not f.startswith("."):
-                            entries.append(f"{indent}  {f}")
-                    if level > 3:  # Limit depth
-                        dirs.clear()
+                entries = self._list_tree(path)
             else:
-                items = sorted(os.listdir(path))
+                # DirEntry caches the file type from the directory read
+                with os.scandir(path) as it:
+                    items = sorted(it, key=lambda e: e.name)
                 for item in items:
-                    if item.startswith("."):
+                    if item.name.startswith("."):
                         continue
-                    full = os.path.join(path, item)
-                    suffix = "/" if os.path.isdir(full) else ""
-                    entries.append(f"  {item}{suffix}")
+                    suffix = "/" if item.is_dir() else ""
+                    entries.append(f"  {item.name}{suffix}")
 
             if not entries:
                 return f"Directory {path} is empty"
 
             header = f"Contents of {path}:\n"
-            return header + "\n".join(entries[:200])  # Cap output
+            return header + "\n".join(entries[:_LIST_MAX_ENTRIES])  # Cap output
         except Exception as e:
             return f"Error listing directory: {e}"
 
+    @staticmethod
+    def _list_tree(path: str) -> list[str]:
+        """List path recursively, depth first, skipping hidden entries.
+
+        Each directory's level travels with it on the stack, so indentation
+        never has to be recovered from the path string. Directories past the
+        depth limit are never opened, and the walk stops once the output cap
+        is reached.
+        """
+        entries = []
+        stack = [(path, 0)]
+        while stack and len(entries) < _LIST_MAX_ENTRIES:
+            root, level = stack.pop()
+            try:
+                with os.scandir(root) as it:
+                    children = list(it)
+            except OSError:
+                continue
+
+            indent = _INDENTS[level]
+            if level > 0:
+                entries.append(f"{indent}{os.path.basename(root)}/")
+
+            files = []
+            subdirs = []
+            for entry in children:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry.name)
+                elif not entry.name.startswith(".") and not entry.is_symlink():
+                    subdirs.append(entry.path)
+
+            for f in sorted(files):
+                if not f.startswith("."):
+                    entries.append(f"{indent}  {f}")
+            if level < _LIST_MAX_DEPTH:
+                # Reversed so subdirectories pop off the stack in listing order
+                stack.extend((d, level + 1) for d in reversed(subdirs))
+        return entries
+
 
 class SearchInFilesTool(Tool):
     """Search for a pattern in files within a directory."""
@@ -197,6 +306,10 @@ class SearchInFilesTool(Tool):
             "required": ["directory", "pattern"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         directory = kwargs["directory"]
         pattern = kwargs["pattern"]
@@ -205,28 +318,21 @@ class SearchInFilesTool(Tool):
         if not os.path.isdir(directory):
             return f"Error: Not a directory: {directory}"
 
-        matches = []
         try:
-            for root, dirs, files in os.walk(directory):
-                dirs[:] = [d for d in dirs if not d.startswith(".")]
-                for filename in sorted(files):
-                    if filename.startswith("."):
-                        continue
-                    if ext_filter and not filename.endswith(ext_filter):
-                        continue
-                    filepath = os.path.join(root, filename)
-                    try:
-                        async with aiofiles.open(filepath, "r", encoding="utf-8") as f:
-                            lines = await f.readlines()
-                        for i, line in enumerate(lines, 1):
-                            if pattern.lower() in line.lower():
-                                rel_path = os.path.relpath(filepath, directory)
-                                matches.append(f"{rel_path}:{i}: {line.rstrip()}")
-                                if len(matches) >= 50:  # Cap results
-                                    matches.append("... (results truncated)")
-                                    return "\n".join(matches)
-                    except (UnicodeDecodeError, PermissionError):
-                        continue
+            # Walk off the event loop; large trees would otherwise stall the bot
+            filepaths = await asyncio.to_thread(_collect_search_files, directory, ext_filter)
+
+            matches = []
+            # Case-insensitive literal match, compiled once for every file
+            rx = re.compile(re.escape(pattern), re.IGNORECASE)
+            rx_bytes = _compile_prefilter(pattern)
+            scan = partial(_search_file, directory, rx, rx_bytes)
+            async for file_matches in scan_concurrently(scan, filepaths):
+                matches.extend(file_matches)
+                if len(matches) >= 50:  # Cap results
+                    del matches[50:]
+                    matches.append("... (results truncated)")
+                    return "\n".join(matches)
 
             if not matches:
                 return f"No matches found for '{pattern}' in {directory}"
@@ -1,15 +1,27 @@
 """Git operations tools."""
 
 import asyncio
+import shutil
 from typing import Any
 
 from controller.tools.base import Tool
 
+# Resolved once so each spawn skips the PATH search
+_GIT = shutil.which("git") or "git"
 
-async def _run_git(args: list[str], cwd: str, timeout: int = 15) -> tuple[int, str, str]:
-    """Run a git command and return (returncode, stdout, stderr)."""
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+async def _run_git(args: list[str], cwd: str, timeout: int = 15) -> tuple[int, bytes, str]:
+    """Run a git command and return (returncode, stdout, stderr).
+
+    stdout is left undecoded so callers that only show part of a large
+    output (such as a diff) decode just that part.
+    """
     proc = await asyncio.create_subprocess_exec(
-        "git", *args,
+        _GIT, *args,
         cwd=cwd,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
@@ -18,8 +30,8 @@ async def _run_git(args: list[str], cwd: str, timeout: int = 15) -> tuple[int, s
         stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
     except asyncio.TimeoutError:
         proc.kill()
-        return -1, "", "Command timed out"
-    return proc.returncode, stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace")
+        return -1, b"", "Command timed out"
+    return proc.returncode, stdout, _decode(stderr)
 
 
 class GitStatusTool(Tool):
@@ -46,12 +58,16 @@ class GitStatusTool(Tool):
             "required": ["repo_path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         repo_path = kwargs["repo_path"]
         code, stdout, stderr = await _run_git(["status", "--short", "--branch"], repo_path)
         if code != 0:
             return f"Error: {stderr.strip()}"
-        return stdout.strip() if stdout.strip() else "Working tree is clean"
+        return _decode(stdout).strip() if stdout.strip() else "Working tree is clean"
 
 
 class GitDiffTool(Tool):
@@ -82,10 +98,15 @@ class GitDiffTool(Tool):
             "required": ["repo_path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         repo_path = kwargs["repo_path"]
         staged = kwargs.get("staged", False)
-        args = ["diff", "--stat"]
+        # One process for both the summary and the patch
+        args = ["diff", "--stat", "--patch"]
         if staged:
             args.append("--cached")
         code, stdout, stderr = await _run_git(args, repo_path)
@@ -94,16 +115,13 @@ class GitDiffTool(Tool):
         if not stdout.strip():
             return "No changes" + (" staged" if staged else "")
 
-        # Also get the actual diff but truncated
-        detail_args = ["diff"]
-        if staged:
-            detail_args.append("--cached")
-        _, detail_out, _ = await _run_git(detail_args, repo_path)
-        # Truncate long diffs
-        lines = detail_out.split("\n")
+        summary, sep, detail = stdout.partition(b"\ndiff --git")
+        lines = (sep.lstrip(b"\n") + detail).split(b"\n")
+        # Truncate long diffs, decoding only the lines that are kept
+        detail_out = _decode(b"\n".join(lines[:100]))
         if len(lines) > 100:
-            detail_out = "\n".join(lines[:100]) + f"\n\n... ({len(lines) - 100} more lines)"
-        return f"Summary:\n{stdout.strip()}\n\nDiff:\n{detail_out.strip()}"
+            detail_out += f"\n\n... ({len(lines) - 100} more lines)"
+        return f"Summary:\n{_decode(summary).strip()}\n\nDiff:\n{detail_out.strip()}"
 
 
 class GitLogTool(Tool):
@@ -134,6 +152,10 @@ class GitLogTool(Tool):
             "required": ["repo_path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         repo_path = kwargs["repo_path"]
         count = min(kwargs.get("count", 10), 30)
@@ -142,7 +164,7 @@ class GitLogTool(Tool):
         )
         if code != 0:
             return f"Error: {stderr.strip()}"
-        return stdout.strip() if stdout.strip() else "No commits yet"
+        return _decode(stdout).strip() if stdout.strip() else "No commits yet"
 
 
 class GitCommitTool(Tool):
@@ -188,7 +210,7 @@ class GitCommitTool(Tool):
         code, stdout, stderr = await _run_git(["commit", "-m", message], repo_path)
         if code != 0:
             return f"Error committing: {stderr.strip()}"
-        return stdout.strip()
+        return _decode(stdout).strip()
 
 
 class GitPushTool(Tool):
@@ -224,5 +246,5 @@ class GitPushTool(Tool):
         code, stdout, stderr = await _run_git(["push"], repo_path, timeout=30)
         if code != 0:
             return f"Error pushing: {stderr.strip()}"
-        output = stdout.strip() or stderr.strip()  # git push often uses stderr for info
+        output = _decode(stdout).strip() or stderr.strip()  # git push often uses stderr for info
         return output if output else "Push successful"
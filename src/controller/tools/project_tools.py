@@ -1,11 +1,63 @@
 """Project structure and metadata tools."""
 
+import asyncio
 import os
+import re
+from functools import partial
 from typing import Any
 
-import aiofiles
-
 from controller.tools.base import Tool
+from controller.tools.scanning import iter_matching_lines, may_contain, read_text, scan_concurrently
+
+# Entries hidden from the project tree
+_TREE_SKIP = frozenset({
+    ".git", ".venv", "venv", "__pycache__", "node_modules", ".DS_Store", ".eggs",
+})
+
+# Directories and file types covered by find_todos
+_TODO_SKIP_DIRS = frozenset({".git", ".venv", "venv", "__pycache__", "node_modules"})
+_TODO_EXTENSIONS = (".py", ".js", ".ts", ".go", ".rs", ".java", ".md")
+_TODO_MARKERS = re.compile("TODO|FIXME|HACK|XXX", re.IGNORECASE)
+_TODO_MARKERS_BYTES = re.compile(b"TODO|FIXME|HACK|XXX", re.IGNORECASE)
+
+
+def _count_lines(path: str) -> int:
+    """Count lines the way text-mode reading would, scanning the raw bytes.
+
+    The decode only validates, so undecodable files still raise
+    UnicodeDecodeError; "\r\n" and a lone "\r" each count as one newline,
+    as universal newlines would.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    data.decode("utf-8")
+    newlines = data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+    return newlines + 1
+
+
+def _collect_todo_files(path: str) -> list[str]:
+    filepaths = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if d not in _TODO_SKIP_DIRS]
+        for filename in sorted(files):
+            if filename.endswith(_TODO_EXTENSIONS):
+                filepaths.append(os.path.join(root, filename))
+    return filepaths
+
+
+def _find_todos_in_file(root_path: str, filepath: str) -> list[str]:
+    # Most files have no markers; rule them out before paying for a decode
+    if not may_contain(filepath, _TODO_MARKERS_BYTES):
+        return []
+    try:
+        data = read_text(filepath)
+    except (UnicodeDecodeError, PermissionError):
+        return []
+    rel = os.path.relpath(filepath, root_path)
+    return [
+        f"[{m.group().upper()}] {rel}:{i}: {line.strip()}"
+        for i, line, m in iter_matching_lines(data, _TODO_MARKERS)
+    ]
 
 
 class ProjectStructureTool(Tool):
@@ -36,6 +88,10 @@ class ProjectStructureTool(Tool):
             "required": ["path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         path = kwargs["path"]
         max_depth = kwargs.get("max_depth", 3)
@@ -44,7 +100,8 @@ class ProjectStructureTool(Tool):
             return f"Error: Not a directory: {path}"
 
         lines = [f"{os.path.basename(path)}/"]
-        self._build_tree(path, lines, "", max_depth, 0)
+        # Walk off the event loop; large trees would otherwise stall the bot
+        await asyncio.to_thread(self._build_tree, path, lines, "", max_depth, 0)
 
         if len(lines) > 150:
             lines = lines[:150]
@@ -59,27 +116,25 @@ class ProjectStructureTool(Tool):
             return
 
         try:
-            entries = sorted(os.listdir(path))
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
         except PermissionError:
             return
 
         # Filter hidden files/dirs and common noise
-        skip = {".git", ".venv", "venv", "__pycache__", "node_modules", ".DS_Store", ".eggs"}
-        entries = [e for e in entries if e not in skip and not e.startswith(".")]
+        entries = [e for e in entries if e.name not in _TREE_SKIP and not e.name.startswith(".")]
 
         for i, entry in enumerate(entries):
-            full_path = os.path.join(path, entry)
             is_last = i == len(entries) - 1
             connector = "+-" if is_last else "|-"
             extension = "  " if is_last else "| "
 
-            if os.path.isdir(full_path):
-                lines.append(f"{prefix}{connector} {entry}/")
-                self._build_tree(full_path, lines, prefix + extension, max_depth, depth + 1)
+            if entry.is_dir():
+                lines.append(f"{prefix}{connector} {entry.name}/")
+                self._build_tree(entry.path, lines, prefix + extension, max_depth, depth + 1)
             else:
-                size = os.path.getsize(full_path)
-                size_str = self._format_size(size)
-                lines.append(f"{prefix}{connector} {entry} ({size_str})")
+                size_str = self._format_size(entry.stat().st_size)
+                lines.append(f"{prefix}{connector} {entry.name} ({size_str})")
 
     @staticmethod
     def _format_size(size: int) -> str:
@@ -115,6 +170,10 @@ class FileInfoTool(Tool):
             "required": ["path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         path = kwargs["path"]
         if not os.path.exists(path):
@@ -129,9 +188,8 @@ class FileInfoTool(Tool):
 
         if os.path.isfile(path):
             try:
-                async with aiofiles.open(path, "r", encoding="utf-8") as f:
-                    content = await f.read()
-                info.append(f"Lines: {content.count(chr(10)) + 1}")
+                line_count = await asyncio.to_thread(_count_lines, path)
+                info.append(f"Lines: {line_count}")
                 info.append(f"Extension: {os.path.splitext(path)[1] or 'none'}")
             except (UnicodeDecodeError, PermissionError):
                 info.append("Content: binary or unreadable")
@@ -163,37 +221,24 @@ class FindTodosTool(Tool):
             "required": ["path"],
         }
 
+    @property
+    def can_memoize(self) -> bool:
+        return True
+
     async def execute(self, **kwargs) -> str:
         path = kwargs["path"]
         if not os.path.isdir(path):
             return f"Error: Not a directory: {path}"
 
-        markers = ["TODO", "FIXME", "HACK", "XXX"]
-        skip_dirs = {".git", ".venv", "venv", "__pycache__", "node_modules"}
-        results = []
+        filepaths = await asyncio.to_thread(_collect_todo_files, path)
 
-        for root, dirs, files in os.walk(path):
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
-            for filename in sorted(files):
-                if not any(filename.endswith(ext) for ext in [".py", ".js", ".ts", ".go", ".rs", ".java", ".md"]):
-                    continue
-                filepath = os.path.join(root, filename)
-                try:
-                    async with aiofiles.open(filepath, "r", encoding="utf-8") as f:
-                        lines = await f.readlines()
-                    for i, line in enumerate(lines, 1):
-                        upper = line.upper()
-                        for marker in markers:
-                            if marker in upper:
-                                rel = os.path.relpath(filepath, path)
-                                results.append(f"[{marker}] {rel}:{i}: {line.strip()}")
-                                break
-                except (UnicodeDecodeError, PermissionError):
-                    continue
-
-                if len(results) >= 50:
-                    results.append("... (results truncated)")
-                    return "\n".join(results)
+        results = []
+        scan = partial(_find_todos_in_file, path)
+        async for file_results in scan_concurrently(scan, filepaths):
+            results.extend(file_results)
+            if len(results) >= 50:
+                results.append("... (results truncated)")
+                return "\n".join(results)
 
         if not results:
             return "No TODO/FIXME/HACK/XXX comments found"
@@ -0,0 +1,75 @@
+"""File reading and scanning helpers shared by the file and project tools."""
+
+import asyncio
+import mmap
+import os
+import re
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Files read concurrently per batch; callers can stop early between batches
+_SCAN_BATCH = 200
+
+# Files above this size are prefiltered through mmap rather than read into memory
+_MMAP_THRESHOLD = 256 * 1024
+
+
+def read_text(path: str) -> str:
+    """Read a whole file as UTF-8 text."""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+async def scan_concurrently(
+    scan: Callable[[str], T], filepaths: list[str]
+) -> AsyncIterator[T]:
+    """Yield scan(filepath) for each file, in order, overlapping the reads.
+
+    Each batch of files is scanned in worker threads at once (bounded by the
+    default executor), so callers that stop early only pay for one batch.
+    """
+    for start in range(0, len(filepaths), _SCAN_BATCH):
+        batch = filepaths[start : start + _SCAN_BATCH]
+        for result in await asyncio.gather(*(asyncio.to_thread(scan, fp) for fp in batch)):
+            yield result
+
+
+def iter_matching_lines(
+    data: str, pattern: re.Pattern[str]
+) -> Iterator[tuple[int, str, re.Match[str]]]:
+    """Yield (line number, line, first match) for each line of data that matches.
+
+    The regex runs over the whole buffer, so stretches without a match are
+    skipped in C and no per-line strings are built for them.
+    """
+    pos = 0
+    lineno = 1
+    counted = 0
+    while pos < len(data) and (m := pattern.search(data, pos)):
+        start = data.rfind("\n", 0, m.start()) + 1
+        end = data.find("\n", m.end())
+        if end == -1:
+            end = len(data)
+        lineno += data.count("\n", counted, start)
+        counted = start
+        yield lineno, data[start:end], m
+        pos = end + 1
+
+
+def may_contain(filepath: str, pattern: re.Pattern[bytes]) -> bool:
+    """Cheaply rule out files with no match by scanning their raw bytes.
+
+    Nothing is decoded; large files are memory-mapped so only the pages the
+    regex touches are loaded.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= _MMAP_THRESHOLD:
+                return pattern.search(f.read()) is not None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return pattern.search(mm) is not None
+    except (OSError, ValueError):
+        # Let the regular read report (or skip) the file as before
+        return True
@@ -5,6 +5,23 @@ from typing import Any
 
 from controller.tools.base import Tool
 
+_MAX_OUTPUT_CHARS = 3000
+# Enough bytes to decode more than _MAX_OUTPUT_CHARS characters of any UTF-8 text
+_MAX_OUTPUT_BYTES = 4 * (_MAX_OUTPUT_CHARS + 1)
+
+
+async def _read_capped(stream: asyncio.StreamReader, limit: int) -> bytes:
+    """Read a stream to EOF, keeping only the first limit bytes.
+
+    The rest is drained and discarded so the child never blocks on a full
+    pipe, while memory stays bounded however much it prints.
+    """
+    buf = bytearray()
+    while chunk := await stream.read(65536):
+        if len(buf) < limit:
+            buf += chunk[: limit - len(buf)]
+    return bytes(buf)
+
 
 class RunCommandTool(Tool):
     """Execute a shell command."""
@@ -58,8 +75,13 @@ class RunCommandTool(Tool):
                 env=None,  # Inherit current environment
             )
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(), timeout=self._timeout
+                stdout, stderr, _ = await asyncio.wait_for(
+                    asyncio.gather(
+                        _read_capped(proc.stdout, _MAX_OUTPUT_BYTES),
+                        _read_capped(proc.stderr, _MAX_OUTPUT_BYTES),
+                        proc.wait(),
+                    ),
+                    timeout=self._timeout,
                 )
             except asyncio.TimeoutError:
                 proc.kill()
@@ -69,11 +91,10 @@ class RunCommandTool(Tool):
             stderr_text = stderr.decode("utf-8", errors="replace")
 
             # Truncate long output
-            max_chars = 3000
-            if len(stdout_text) > max_chars:
-                stdout_text = stdout_text[:max_chars] + "\n... (output truncated)"
-            if len(stderr_text) > max_chars:
-                stderr_text = stderr_text[:max_chars] + "\n... (stderr truncated)"
+            if len(stdout_text) > _MAX_OUTPUT_CHARS:
+                stdout_text = stdout_text[:_MAX_OUTPUT_CHARS] + "\n... (output truncated)"
+            if len(stderr_text) > _MAX_OUTPUT_CHARS:
+                stderr_text = stderr_text[:_MAX_OUTPUT_CHARS] + "\n... (stderr truncated)"
 
             parts = [f"Exit code: {proc.returncode}"]
             if stdout_text.strip():
@@ -0,0 +1,387 @@
+"""Tests for the Gemini agent's tool dispatch."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from google.genai import types
+
+from controller.agent.core import (
+    MAX_ARG_PREVIEW,
+    MAX_CONFIRMATION_CHARS,
+    TOOL_ROUND,
+    Agent,
+    _summarize_args,
+)
+from controller.security.permissions import PermissionManager
+from controller.tools.base import Tool, ToolRegistry
+
+
+class CountingTool(Tool):
+    """Test tool that records how many times it was executed."""
+
+    def __init__(self, name: str, memoize: bool):
+        self._name = name
+        self._memoize = memoize
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "Counting tool for tests"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"path": {"type": "string"}}}
+
+    @property
+    def can_memoize(self) -> bool:
+        return self._memoize
+
+    async def execute(self, **kwargs) -> str:
+        self.calls += 1
+        return f"result {self.calls}"
+
+
+class StateTool(Tool):
+    """Test tool that reads or writes a shared value, with a slow read."""
+
+    def __init__(self, name: str, state: dict, write: bool):
+        self._name = name
+        self._state = state
+        self._write = write
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "State tool for tests"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {}}
+
+    @property
+    def can_memoize(self) -> bool:
+        return not self._write
+
+    async def execute(self, **kwargs) -> str:
+        self.calls += 1
+        if self._write:
+            self._state["value"] = "new"
+            return "written"
+        value = self._state["value"]
+        await asyncio.sleep(0.01)  # Still in flight when the write lands
+        return value
+
+
+class LoggingTool(Tool):
+    """Test tool that records when each call starts and finishes."""
+
+    def __init__(self, name: str, log: list[str], delay: float = 0.0):
+        self._name = name
+        self._log = log
+        self._delay = delay
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "Logging tool for tests"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {}}
+
+    async def execute(self, **kwargs) -> str:
+        self._log.append(f"{self._name} start")
+        await asyncio.sleep(self._delay)
+        self._log.append(f"{self._name} end")
+        return "ok"
+
+
+class FakeModels:
+    """Stand-in for client.aio.models that replays scripted streamed rounds."""
+
+    def __init__(self, rounds: list[list[types.Part]]):
+        self._rounds = list(rounds)
+
+    async def generate_content_stream(self, **kwargs):
+        parts = self._rounds.pop(0)
+
+        async def stream():
+            for part in parts:
+                content = types.Content(role="model", parts=[part])
+                yield SimpleNamespace(candidates=[SimpleNamespace(content=content)])
+
+        return stream()
+
+
+def fake_client(rounds: list[list[types.Part]]) -> SimpleNamespace:
+    return SimpleNamespace(aio=SimpleNamespace(models=FakeModels(rounds)))
+
+
+@pytest.fixture
+def reader():
+    return CountingTool("read_thing", memoize=True)
+
+
+@pytest.fixture
+def writer():
+    return CountingTool("write_thing", memoize=False)
+
+
+@pytest.fixture
+def agent(config, reader, writer):
+    registry = ToolRegistry()
+    registry.register(reader)
+    registry.register(writer)
+    return Agent(config, registry, PermissionManager(config))
+
+
+class TestToolMemoization:
+    @pytest.mark.asyncio
+    async def test_repeated_call_uses_cache(self, agent, reader, tmp_project):
+        args = {"path": str(tmp_project)}
+        first = await agent._execute_tool("channel", "read_thing", dict(args), None)
+        second = await agent._execute_tool("channel", "read_thing", dict(args), None)
+        assert first == second
+        assert reader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_different_args_not_cached(self, agent, reader, tmp_project):
+        await agent._execute_tool("channel", "read_thing", {"path": str(tmp_project)}, None)
+        await agent._execute_tool("channel", "read_thing", {"path": str(tmp_project / "src")}, None)
+        assert reader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_side_effecting_tool_invalidates_cache(
+        self, agent, reader, writer, tmp_project
+    ):
+        args = {"path": str(tmp_project)}
+        await agent._execute_tool("channel", "read_thing", dict(args), None)
+        await agent._execute_tool("channel", "write_thing", dict(args), None)
+        await agent._execute_tool("channel", "read_thing", dict(args), None)
+        assert reader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_clear_history_invalidates_cache(self, agent, reader, tmp_project):
+        args = {"path": str(tmp_project)}
+        await agent._execute_tool("channel", "read_thing", dict(args), None)
+        agent.clear_history("channel")
+        await agent._execute_tool("channel", "read_thing", dict(args), None)
+        assert reader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_is_per_channel(self, agent, reader, tmp_project):
+        args = {"path": str(tmp_project)}
+        await agent._execute_tool("channel", "read_thing", dict(args), None)
+        await agent._execute_tool("other", "read_thing", dict(args), None)
+        assert reader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_new_turn_reexecutes_tool(self, agent, reader, tmp_project):
+        call = types.Part.from_function_call(name="read_thing", args={"path": str(tmp_project)})
+        agent.client = fake_client([
+            [call],
+            [types.Part.from_text(text="one")],
+            [call],
+            [types.Part.from_text(text="two")],
+        ])
+        [c async for c in agent.process_message("channel", "first")]
+        [c async for c in agent.process_message("channel", "second")]
+        assert reader.calls == 2
+        assert agent._tool_caches == {}
+
+
+class TestConcurrentDispatch:
+    @pytest.mark.asyncio
+    async def test_confirmations_are_serialized(self, config, tmp_project):
+        registry = ToolRegistry()
+        registry.register(CountingTool("write_file", memoize=False))
+        agent = Agent(config, registry, PermissionManager(config))
+
+        active = 0
+        max_active = 0
+
+        async def confirm(tool_name, description):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return True
+
+        args = {"path": str(tmp_project / "f.txt")}
+        lock = asyncio.Lock()
+        results = await asyncio.gather(
+            agent._execute_tool("channel", "write_file", dict(args), confirm, lock),
+            agent._execute_tool("channel", "write_file", dict(args), confirm, lock),
+        )
+        assert sorted(results) == ["result 1", "result 2"]
+        assert max_active == 1
+
+    @pytest.mark.asyncio
+    async def test_pending_confirmation_does_not_block_other_turns(self, config, tmp_project):
+        registry = ToolRegistry()
+        registry.register(CountingTool("write_file", memoize=False))
+        agent = Agent(config, registry, PermissionManager(config))
+
+        answered = asyncio.Event()
+
+        async def confirm_pending(tool_name, description):
+            await answered.wait()
+            return True
+
+        async def confirm_now(tool_name, description):
+            return True
+
+        args = {"path": str(tmp_project / "f.txt")}
+        pending = asyncio.create_task(
+            agent._execute_tool("a", "write_file", dict(args), confirm_pending, asyncio.Lock())
+        )
+        await asyncio.sleep(0)
+        result = await asyncio.wait_for(
+            agent._execute_tool("b", "write_file", dict(args), confirm_now, asyncio.Lock()),
+            timeout=1,
+        )
+        assert result == "result 1"
+        answered.set()
+        assert await pending == "result 2"
+
+    @pytest.mark.asyncio
+    async def test_read_racing_write_is_not_cached(self, config):
+        state = {"value": "old"}
+        registry = ToolRegistry()
+        registry.register(StateTool("read_x", state, write=False))
+        registry.register(StateTool("write_x", state, write=True))
+        agent = Agent(config, registry, PermissionManager(config))
+
+        await asyncio.gather(
+            agent._execute_tool("channel", "read_x", {}, None),
+            agent._execute_tool("channel", "write_x", {}, None),
+        )
+        assert await agent._execute_tool("channel", "read_x", {}, None) == "new"
+
+    @pytest.mark.asyncio
+    async def test_side_effecting_calls_run_in_order(self, config):
+        config.require_confirmation = False
+        log: list[str] = []
+        registry = ToolRegistry()
+        registry.register(LoggingTool("write_file", log, delay=0.01))
+        registry.register(LoggingTool("git_commit", log))
+        agent = Agent(config, registry, PermissionManager(config))
+        agent.client = fake_client([
+            [
+                types.Part.from_function_call(name="write_file", args={}),
+                types.Part.from_function_call(name="git_commit", args={}),
+            ],
+            [types.Part.from_text(text="Committed")],
+        ])
+
+        [c async for c in agent.process_message("channel", "save and commit")]
+        assert log == ["write_file start", "write_file end", "git_commit start", "git_commit end"]
+
+
+class TestHistory:
+    def test_history_is_bounded(self, agent):
+        history = agent._get_history("channel")
+        for i in range(Agent.MAX_HISTORY + 5):
+            history.append(i)
+        assert len(agent._get_history("channel")) == Agent.MAX_HISTORY
+        assert agent._get_history("channel")[0] == 5
+
+
+class TestUnknownTool:
+    @pytest.mark.asyncio
+    async def test_unknown_tool_returns_error(self, agent):
+        result = await agent._execute_tool("channel", "no_such_tool", {}, None)
+        assert result == "Error: Unknown tool 'no_such_tool'"
+
+
+class TestStreaming:
+    @pytest.mark.asyncio
+    async def test_streams_text_across_tool_rounds(self, agent, reader, tmp_project):
+        agent.client = fake_client([
+            [
+                types.Part.from_text(text="Checking..."),
+                types.Part.from_function_call(
+                    name="read_thing", args={"path": str(tmp_project)}
+                ),
+            ],
+            [types.Part.from_text(text="All "), types.Part.from_text(text="good")],
+        ])
+        chunks = [c async for c in agent.process_message("channel", "hi")]
+        assert chunks == ["Checking...", TOOL_ROUND, "\n\n", "All ", "good"]
+        assert reader.calls == 1
+        # user, model (call), user (response), model (answer)
+        assert len(agent._get_history("channel")) == 4
+
+    @pytest.mark.asyncio
+    async def test_error_starts_new_paragraph(self, agent):
+        async def generate_content_stream(**kwargs):
+            async def stream():
+                content = types.Content(
+                    role="model", parts=[types.Part.from_text(text="Partial answer")]
+                )
+                yield SimpleNamespace(candidates=[SimpleNamespace(content=content)])
+                raise RuntimeError("stream dropped")
+
+            return stream()
+
+        agent.client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+            generate_content_stream=generate_content_stream
+        )))
+        chunks = [c async for c in agent.process_message("channel", "hi")]
+        assert chunks[:2] == ["Partial answer", "\n\n"]
+        assert chunks[2].startswith("An error occurred")
+
+    @pytest.mark.asyncio
+    async def test_done_when_no_text(self, agent):
+        agent.client = fake_client([[]])
+        chunks = [c async for c in agent.process_message("channel", "hi")]
+        assert chunks == ["Done."]
+
+
+class TestSummarizeArgs:
+    def test_short_values_unchanged(self):
+        assert _summarize_args({"path": "/a", "count": 3}) == '{"path": "/a", "count": 3}'
+
+    def test_long_string_shortened(self):
+        content = "x" * (MAX_ARG_PREVIEW + 50)
+        summary = _summarize_args({"content": content})
+        assert content not in summary
+        assert f"({len(content)} chars)" in summary
+
+    def test_long_command_shown_in_full(self):
+        command = "echo ok" + " " * MAX_ARG_PREVIEW + "; rm -rf build"
+        assert command in _summarize_args({"command": command})
+
+
+class TestConfirmationPrompt:
+    @pytest.mark.asyncio
+    async def test_oversized_prompt_is_refused(self, config, tmp_project):
+        tool = CountingTool("run_command", memoize=False)
+        registry = ToolRegistry()
+        registry.register(tool)
+        agent = Agent(config, registry, PermissionManager(config))
+        prompts = []
+
+        async def confirm(tool_name, description):
+            prompts.append(description)
+            return True
+
+        args = {"command": "x" * MAX_CONFIRMATION_CHARS, "cwd": str(tmp_project)}
+        result = await agent._execute_tool("channel", "run_command", args, confirm)
+        assert result.startswith("Error: arguments to 'run_command' are too long")
+        assert prompts == []
+        assert tool.calls == 0
@@ -31,6 +31,13 @@ class TestSplitMessage:
         # Each chunk should end/start cleanly
         assert not result[0].endswith("\n\n")
 
+    def test_many_chunks_preserve_content(self):
+        words = [f"word{i}" for i in range(2000)]
+        result = split_message(" ".join(words), max_length=200)
+        assert len(result) > 10
+        assert all(len(chunk) <= 200 for chunk in result)
+        assert " ".join(result).split() == words
+
     def test_preserves_code_blocks(self):
         text = "before\n```python\n" + "x = 1\n" * 500 + "```\nafter"
         result = split_message(text, max_length=1900)
@@ -71,3 +78,7 @@ class TestTruncate:
         result = truncate(long, 100)
         assert len(result) == 100
         assert result.endswith("(truncated)")
+
+    def test_suffix_longer_than_limit(self):
+        result = truncate("x" * 50, 5, suffix="...(cut)")
+        assert result == "...(cut)"
@@ -27,6 +27,13 @@ class TestPathPermissions:
         # Path doesn't exist yet but is within allowed dir
         assert manager.is_path_allowed(str(tmp_project / "new" / "file.py")) is True
 
+    def test_allowed_dir_itself(self, manager, tmp_project):
+        assert manager.is_path_allowed(str(tmp_project)) is True
+
+    def test_sibling_with_shared_prefix(self, manager, tmp_project):
+        sibling = tmp_project.parent / (tmp_project.name + "-other")
+        assert manager.is_path_allowed(str(sibling / "file.py")) is False
+
 
 class TestUserPermissions:
     def test_allowed_user(self, manager):
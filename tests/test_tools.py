@@ -1,17 +1,43 @@
 """Tests for local tool implementations."""
 
 import os
+import subprocess
 
 import pytest
 
+from controller.tools.base import ToolRegistry
 from controller.tools.file_tools import (
     ListDirectoryTool,
     ReadFileTool,
     SearchInFilesTool,
     WriteFileTool,
 )
-from controller.tools.git_tools import GitLogTool, GitStatusTool
-from controller.tools.project_tools import FileInfoTool, FindTodosTool, ProjectStructureTool
+from controller.tools.git_tools import GitDiffTool, GitLogTool, GitStatusTool
+from controller.tools.project_tools import (
+    FileInfoTool,
+    FindTodosTool,
+    ProjectStructureTool,
+    _count_lines,
+)
+from controller.tools.shell_tools import RunCommandTool
+
+
+class TestToolRegistry:
+    def test_version_bumps_on_register(self):
+        registry = ToolRegistry()
+        assert registry.version == 0
+        registry.register(ReadFileTool())
+        registry.register(WriteFileTool())
+        assert registry.version == 2
+
+    def test_declarations_refresh_on_register(self):
+        registry = ToolRegistry()
+        registry.register(ReadFileTool())
+        first = registry.get_function_declarations()
+        assert registry.get_function_declarations() is first
+        registry.register(WriteFileTool())
+        names = [d["name"] for d in registry.get_function_declarations()]
+        assert names == ["read_file", "write_file"]
 
 
 class TestReadFileTool:
@@ -103,6 +129,33 @@ class TestSearchInFilesTool:
         )
         assert "main.py" in result
 
+    @pytest.mark.asyncio
+    async def test_search_large_file(self, tool, tmp_path):
+        (tmp_path / "big.txt").write_text("filler line\n" * 50000 + "the Needle here\n")
+        (tmp_path / "big_miss.txt").write_text("filler line\n" * 50000)
+        result = await tool.execute(directory=str(tmp_path), pattern="needle")
+        assert result == "big.txt:50001: the Needle here"
+
+    @pytest.mark.asyncio
+    async def test_search_folds_non_ascii_case(self, tool, tmp_path):
+        # Kelvin sign and long s fold to "k" and "s" in case-insensitive matching
+        (tmp_path / "units.txt").write_text("rated 300\u212a\nmi\u017fsing\n", encoding="utf-8")
+        assert await tool.execute(directory=str(tmp_path), pattern="300k") == (
+            "units.txt:1: rated 300\u212a"
+        )
+        assert await tool.execute(directory=str(tmp_path), pattern="missing") == (
+            "units.txt:2: mi\u017fsing"
+        )
+
+    @pytest.mark.asyncio
+    async def test_search_caps_results_in_file_order(self, tool, tmp_path):
+        for i in range(300):
+            (tmp_path / f"f{i:03d}.txt").write_text("needle\n")
+        result = await tool.execute(directory=str(tmp_path), pattern="needle")
+        lines = result.splitlines()
+        assert lines[-1] == "... (results truncated)"
+        assert [line.split(":")[0] for line in lines[:-1]] == [f"f{i:03d}.txt" for i in range(50)]
+
 
 class TestProjectStructureTool:
     @pytest.fixture
@@ -128,6 +181,91 @@ class TestFileInfoTool:
         assert "file" in result
 
 
+    @pytest.mark.asyncio
+    async def test_file_info_counts_crlf_lines(self, tool, tmp_path):
+        path = tmp_path / "windows.txt"
+        path.write_bytes(b"one\r\ntwo\r\nthree")
+        result = await tool.execute(path=str(path))
+        assert "Lines: 3" in result
+
+    @pytest.mark.asyncio
+    async def test_file_info_binary(self, tool, tmp_path):
+        path = tmp_path / "blob.bin"
+        path.write_bytes(b"\xff\xfe\x00")
+        result = await tool.execute(path=str(path))
+        assert "Content: binary or unreadable" in result
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"", b"a", b"a\n", b"a\nb", b"a\r\nb\r\n", b"a\rb\rc", b"a\r\r\nb\n\rc", b"\r"],
+    )
+    def test_count_lines_matches_text_mode(self, tmp_path, data):
+        path = tmp_path / "f.txt"
+        path.write_bytes(data)
+        with open(path, encoding="utf-8") as f:
+            expected = f.read().count("\n") + 1
+        assert _count_lines(str(path)) == expected
+
+
+class TestGitDiffTool:
+    @pytest.fixture
+    def tool(self):
+        return GitDiffTool()
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        def git(*args):
+            subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+        git("init", "-q")
+        git("config", "user.email", "test@example.com")
+        git("config", "user.name", "Test")
+        (tmp_path / "a.txt").write_text("".join(f"line {i}\n" for i in range(200)))
+        (tmp_path / "b.txt").write_text("before\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "initial")
+        return tmp_path
+
+    @pytest.mark.asyncio
+    async def test_no_changes(self, tool, repo):
+        assert await tool.execute(repo_path=str(repo)) == "No changes"
+        assert await tool.execute(repo_path=str(repo), staged=True) == "No changes staged"
+
+    @pytest.mark.asyncio
+    async def test_summary_and_patch(self, tool, repo):
+        (repo / "b.txt").write_text("after\n")
+        result = await tool.execute(repo_path=str(repo))
+        summary, _, diff = result.partition("\n\nDiff:\n")
+        assert summary.startswith("Summary:\n")
+        assert "b.txt | 2 +-" in summary
+        assert "1 file changed" in summary
+        assert "diff --git" not in summary
+        assert diff.startswith("diff --git a/b.txt b/b.txt")
+        assert "-before\n+after" in diff
+
+    @pytest.mark.asyncio
+    async def test_staged_only(self, tool, repo):
+        (repo / "a.txt").write_text("unstaged\n")
+        (repo / "b.txt").write_text("after\n")
+        subprocess.run(["git", "add", "b.txt"], cwd=repo, check=True)
+        result = await tool.execute(repo_path=str(repo), staged=True)
+        assert "b.txt" in result
+        assert "a.txt" not in result
+
+    @pytest.mark.asyncio
+    async def test_long_diff_truncated(self, tool, repo):
+        (repo / "a.txt").write_text("".join(f"changed {i}\n" for i in range(200)))
+        patch = subprocess.run(
+            ["git", "diff", "--patch"], cwd=repo, check=True, capture_output=True, text=True
+        ).stdout
+        total = len(patch.split("\n"))
+        result = await tool.execute(repo_path=str(repo))
+        diff = result.partition("\n\nDiff:\n")[2]
+        shown, _, note = diff.partition("\n\n... (")
+        assert shown.splitlines() == patch.split("\n")[:100]
+        assert note == f"{total - 100} more lines)"
+
+
 class TestFindTodosTool:
     @pytest.fixture
     def tool(self):
@@ -138,3 +276,23 @@ class TestFindTodosTool:
         result = await tool.execute(path=str(tmp_project))
         assert "TODO" in result
         assert "main.py" in result
+
+
+class TestRunCommandTool:
+    @pytest.fixture
+    def tool(self):
+        return RunCommandTool(timeout=10)
+
+    @pytest.mark.asyncio
+    async def test_echo(self, tool, tmp_project):
+        result = await tool.execute(command="echo hello", cwd=str(tmp_project))
+        assert "Exit code: 0" in result
+        assert "hello" in result
+
+    @pytest.mark.asyncio
+    async def test_large_output_truncated(self, tool, tmp_project):
+        command = "yes x | head -c 1000000; exit 3"
+        result = await tool.execute(command=command, cwd=str(tmp_project))
+        assert "Exit code: 3" in result
+        assert "(output truncated)" in result
+        assert len(result) < 4000